@@ -1,4 +1,3 @@
-import json
 import sys
 from enum import Enum
 from typing import Annotated
@@ -11,19 +10,15 @@ from shed.custom_types import (
     ProjectEnvironment,
     ProjectEnvironParser,
 )
-from .core import (
-    clone_database,
-    create_revision,
-    init_project,
-    migrate_database,
-    run_alembic,
-    yield_models_by_file,
-)
 from .settings import Settings, default_settings_path
 from .validation import (
     validate_matching_db_types,
 )
 from .constants import SETTINGS_PATH_ENV_VAR, PROG_NAME
+from .utils import dump_json
+
+# shed.core pulls in sqlmodel and sqlalchemy, it is imported inside the commands
+# so that --help and the settings commands start quickly
 
 app = typer.Typer(
     name=PROG_NAME,
@@ -67,7 +62,7 @@ OptionalDBConnection = Annotated[
     typer.Option(
         "--connection",
         "-c",
-        help="Examples: sqlite:/opt/site.db | postgres://user:pw@localhost:5432/db_name",
+        help="Examples: sqlite:////opt/site.db | postgres://user:pw@localhost:5432/db_name",
         parser=parse_connection,
     ),
 ]
@@ -104,11 +99,11 @@ def init(
     ] = CliDBType.sqlite,
 ):
     """Initialize migration folder for a project."""
+    from .core import init_project
+
     settings: Settings = ctx.obj["settings"]
     if connection:
-        connection.value.connection._convert_paths(
-            settings.settings_path.parent.absolute(), mode="abs"
-        )
+        connection.value.connection._convert_paths(settings.root_dir, mode="abs")
     result = init_project(
         settings,
         project_name,
@@ -144,6 +139,8 @@ def migrate(
     ] = "head",
 ):
     """Run database migrations."""
+    from .core import migrate_database
+
     result = migrate_database(
         target.project_config, target.db_config, dry_run, revision
     )
@@ -170,6 +167,8 @@ def clone(
     ] = False,
 ):
     """Clone database from source to target (same database type only)."""
+    from .core import clone_database
+
     settings = ctx.obj["settings"]
     if not target:
         # use dev db
@@ -213,6 +212,8 @@ def revision(
     ] = True,
 ):
     """Create a new migration revision."""
+    from .core import create_revision
+
     result = create_revision(
         target.project_config, target.db_config, message, autogenerate, use_ruff
     )
@@ -237,6 +238,8 @@ def alembic(
     Run raw alembic commands for a given project environment.
     Usage: shed alembic project.env -h
     """
+    from .core import run_alembic
+
     project_config = target.project_config
     db_config = target.db_config
     result = run_alembic(ctx.args, project_config, db_config)
@@ -258,6 +261,8 @@ def export_json_schemas(
     indent: int = 2,
 ):
     """Exports jsonschemas using <project_name>.<class_name>.json naming pattern"""
+    from .core import yield_models_by_file
+
     settings: Settings = ctx.obj["settings"]
     for project_name, file in settings.all_code_files():
         if not file.exists():
@@ -266,8 +271,7 @@ def export_json_schemas(
         for cls in yield_models_by_file(file):
             fn = f"{project_name}.{cls.__name__}.json"
             schema = cls.model_json_schema(by_alias=by_alias, mode="serialization")
-            schema_str = json.dumps(schema, indent=indent)
-            (output_dir / fn).write_text(schema_str)
+            (output_dir / fn).write_bytes(dump_json(schema, indent=indent))
 
 
 @app.command()
@@ -279,7 +283,7 @@ def config_schema(pretty: bool = True):
 
         print_json(data=s)
     else:
-        typer.secho(json.dumps(s))
+        typer.secho(dump_json(s).decode())
 
 
 if __name__ == "__main__":
@@ -1,14 +1,18 @@
 import contextlib
 import importlib.util
+import io
+import logging
 import os
 import re
+import subprocess
+import sys
 import tempfile
+import traceback
+from dataclasses import dataclass
 from pathlib import Path
-from typing import NamedTuple, Any, Callable, Generator, Literal
-import importlib
-import inspect
+from types import ModuleType
+from typing import Any, Callable, Generator, Literal
 from functools import lru_cache
-import shutil
 
 import typer
 from pydantic import BaseModel
@@ -24,16 +28,23 @@ from .settings import (
 )
 
 
+# Matches {{key}} and {{ key }} patterns (with optional spaces)
+_TEMPLATE_RE = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
 def render_template(template: str, **variables: Any) -> str:
     """Poor mans jinja function"""
-    result = template
-    for key, value in variables.items():
-        # Replace {{key}} and {{ key }} patterns (with optional spaces)
-        result = re.sub(r"\{\{\s*" + re.escape(key) + r"\s*\}\}", str(value), result)
-    return result
+
+    def replace(m: re.Match) -> str:
+        key = m.group(1)
+        # Unknown placeholders are left untouched
+        return str(variables[key]) if key in variables else m.group(0)
+
+    return _TEMPLATE_RE.sub(replace, template)
 
 
-class InitResult(NamedTuple):
+@dataclass(slots=True, frozen=True)
+class InitResult:
     """Result of initialization operation."""
 
     success: bool
@@ -42,7 +53,8 @@ class InitResult(NamedTuple):
     models_path: str | None = None
 
 
-class MigrateResult(NamedTuple):
+@dataclass(slots=True, frozen=True)
+class MigrateResult:
     """Result of migration operation."""
 
     success: bool
@@ -50,14 +62,16 @@ class MigrateResult(NamedTuple):
     sql: str | None = None
 
 
-class CloneResult(NamedTuple):
+@dataclass(slots=True, frozen=True)
+class CloneResult:
     """Result of clone operation."""
 
     success: bool
     message: str
 
 
-class RevisionResult(NamedTuple):
+@dataclass(slots=True, frozen=True)
+class RevisionResult:
     """Result of revision creation operation."""
 
     success: bool
@@ -65,16 +79,17 @@ class RevisionResult(NamedTuple):
     revision_file: str | None = None
 
 
-@lru_cache(maxsize=32)
-def module_path_root(module: str):
-    if isinstance(module, str):
-        module = importlib.import_module(module)
+templates_path = Path(__file__).parent / "templates"
 
-    assert module is not None
-    return Path(inspect.getfile(module)).parents[0]
 
+@lru_cache(maxsize=4)
+def _read_template(name: str) -> str:
+    return (templates_path / name).read_text()
 
-templates_path = module_path_root(PROG_NAME) / "templates"
+
+@lru_cache(maxsize=4)
+def _read_template_bytes(name: str) -> bytes:
+    return (templates_path / name).read_bytes()
 
 
 def init_project(
@@ -95,13 +110,11 @@ def init_project(
         output_dir = s_p
     project_dir = (output_dir / project_name).resolve()
 
-    try:
-        project_rel_path = project_dir.relative_to(s_p)
-    except ValueError:
+    if not project_dir.is_relative_to(s_p):
         typer.secho(f"Project '{project_dir}' is not a subpath of {s_p}", err=True)
         raise typer.Exit(1)
 
-    models_rel_path = project_rel_path / "models.py"
+    models_rel_path = project_dir.relative_to(s_p) / "models.py"
     models_path = project_dir / "models.py"
 
     if project_name not in settings.projects:
@@ -173,16 +186,15 @@ def clone_database(
 
 @contextlib.contextmanager
 def create_temp_dir():
-    temp_dir = Path(tempfile.mkdtemp())
-    yield temp_dir
-    shutil.rmtree(temp_dir)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield Path(temp_dir)
 
 
 def create_alembic_temp_files(tmp: Path, models_path: Path, versions_dir: Path) -> None:
     # Create temporary alembic.ini file
-    alembic_ini_content = (templates_path / "alembic.ini").read_text()
+    alembic_ini_content = _read_template("alembic.ini")
     # Create temporary env.py file
-    env_py_content = (templates_path / "env.py").read_text()
+    env_py_content = _read_template("env.py")
     env_py_content = render_template(
         env_py_content,
         models_path=models_path,
@@ -203,35 +215,153 @@ def create_alembic_temp_files(tmp: Path, models_path: Path, versions_dir: Path)
     env_py_path = alembic_script_dir / "env.py"
     env_py_path.write_text(env_py_content)
 
-    script_template = templates_path / "script.py.mako"
-    script_template_path = alembic_script_dir / script_template.name
-    shutil.copy2(script_template, script_template_path)
+    script_template = "script.py.mako"
+    (alembic_script_dir / script_template).write_bytes(
+        _read_template_bytes(script_template)
+    )
+
+
+def _all_loggers() -> list[logging.Logger]:
+    return [logging.getLogger()] + [
+        lg
+        for lg in logging.Logger.manager.loggerDict.values()
+        if isinstance(lg, logging.Logger)
+    ]
+
+
+def _dispose_mapped_classes(module_names: set[str]) -> None:
+    """Remove the tables and mappers of the SQLModel classes of some modules."""
+    registry = SQLModel._sa_registry
+    # A re-import declares the classes again, which warns as long as the old
+    # ones are still in the registry. SQLAlchemy can only dispose of a whole
+    # registry publicly, so single classes go through private API verified
+    # against SQLAlchemy 2.0.41. Without it the classes are left registered.
+    managers = getattr(registry, "_managers", None)
+    dispose = getattr(registry, "_dispose_manager_and_mapper", None)
+    for mapper in list(registry.mappers):
+        cls = mapper.class_
+        if cls.__module__ not in module_names:
+            continue
+        table = getattr(cls, "__table__", None)
+        if table is not None and table.metadata is SQLModel.metadata:
+            SQLModel.metadata.remove(table)
+        if managers is not None and dispose is not None:
+            managers.pop(mapper.class_manager, None)
+            dispose(mapper.class_manager)
+
+
+@contextlib.contextmanager
+def _restore_interpreter_state(project_dir: Path):
+    """Undo the global state a run of the alembic env.py leaves behind.
+
+    env.py puts the project on sys.path, imports the user models, registers
+    their tables on the shared SQLModel metadata and configures logging from
+    alembic.ini. Running it in-process would otherwise leak all of that into
+    the next run. Modules imported from ``project_dir`` during the run are
+    forgotten together with the tables and classes they defined.
+    """
+    project_dir = project_dir.resolve()
+    prev_path = sys.path[:]
+    prev_modules = set(sys.modules)
+    prev_loggers = {
+        lg: (lg.handlers[:], lg.level, lg.disabled) for lg in _all_loggers()
+    }
+    try:
+        yield
+    finally:
+        sys.path[:] = prev_path
+        # Forget user modules so the next run imports the current project
+        purged = set()
+        for name in set(sys.modules) - prev_modules:
+            file = getattr(sys.modules[name], "__file__", None)
+            if file and Path(file).resolve().is_relative_to(project_dir):
+                del sys.modules[name]
+                purged.add(name)
+        _dispose_mapped_classes(purged)
+        for lg in _all_loggers():
+            handlers, level, disabled = prev_loggers.get(
+                lg, ([], logging.NOTSET, False)
+            )
+            for handler in lg.handlers:
+                if handler not in handlers:
+                    handler.close()
+            lg.handlers[:] = handlers
+            lg.setLevel(level)
+            lg.disabled = disabled
+
+
+def _invoke_alembic(argv: list[str], project_dir: Path) -> subprocess.CompletedProcess:
+    """Run the alembic command line in this process, capturing its output.
+
+    ``project_dir`` holds the user models imported by env.py.
+    """
+    from alembic.config import CommandLine
+
+    stdout, stderr = io.StringIO(), io.StringIO()
+    returncode = 0
+    with (
+        _restore_interpreter_state(project_dir),
+        contextlib.redirect_stdout(stdout),
+        contextlib.redirect_stderr(stderr),
+    ):
+        try:
+            CommandLine(prog="alembic").main(argv=argv)
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                returncode = e.code or 0
+            else:
+                print(e.code, file=sys.stderr)
+                returncode = 1
+        # Report any failure of env.py or the user models like the alembic
+        # process would, instead of crashing the shed command
+        except Exception:  # noqa: BLE001
+            traceback.print_exc()
+            returncode = 1
+    return subprocess.CompletedProcess(
+        ["alembic", *argv], returncode, stdout.getvalue(), stderr.getvalue()
+    )
+
+
+@contextlib.contextmanager
+def alembic_workspace(project_cfg: ProjectConfig) -> Generator[Path, None, None]:
+    """Temporary alembic script directory for a project."""
+    with create_temp_dir() as tmp:
+        create_alembic_temp_files(tmp, project_cfg.module, project_cfg.versions_dir)
+        yield tmp
 
 
 def run_alembic(
     cmd: list[str],
     project_cfg: ProjectConfig,
     db_config: DatabaseConfig,
-):
-    import subprocess
-
-    with create_temp_dir() as tmp:
-        create_alembic_temp_files(tmp, project_cfg.module, project_cfg.versions_dir)
-        # Run alembic revision command
-        cmd = ["alembic", "-c", str(tmp / "alembic.ini"), *cmd]
-        env = os.environ.copy()
-        env["SHED_CURRENT_DSN"] = db_config.connection.get_dsn
-        env["SHED_CURRENT_SCHEMA"] = db_config.connection.schema_name or ""
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            cwd=str(project_cfg.migrations_dir.parent),
-            env=env,
-        )
+) -> subprocess.CompletedProcess:
+    from .utils import env_override
+
+    with alembic_workspace(project_cfg) as ws:
+        # Run alembic in-process, saving the interpreter start-up and imports
+        argv = ["-c", str(ws / "alembic.ini"), *cmd]
+        # All paths handed to alembic are absolute and env.py puts the models
+        # directory on sys.path itself, so the working directory is left alone
+        with env_override(
+            SHED_CURRENT_DSN=db_config.connection.get_dsn,
+            SHED_CURRENT_SCHEMA=db_config.connection.schema_name or "",
+        ):
+            result = _invoke_alembic(argv, project_cfg.module.parent)
     return result
 
 
+def latest_revision_file(versions_dir: Path) -> Path | None:
+    """Return the most recently modified revision file in a single directory scan."""
+    latest_mtime, latest = -1, None
+    with os.scandir(versions_dir) as entries:
+        for entry in entries:
+            if entry.name.endswith(".py") and entry.is_file():
+                mtime = entry.stat().st_mtime_ns
+                if mtime > latest_mtime:
+                    latest_mtime, latest = mtime, entry.path
+    return Path(latest) if latest else None
+
+
 def create_revision(
     project_config: ProjectConfig,
     db_config: DatabaseConfig,
@@ -260,8 +390,7 @@ def create_revision(
             success=False, message=f"Alembic revision failed: {result.stderr}"
         )
     # Find the created revision file
-    revision_files = list(versions_dir.glob("*.py"))
-    latest_revision = max(revision_files, key=lambda p: p.stat().st_mtime, default=None)
+    latest_revision = latest_revision_file(versions_dir)
 
     # Format with ruff if enabled and available
     if use_ruff and latest_revision and is_ruff_available():
@@ -308,23 +437,30 @@ def migrate_database(
 
 
 def exportable_model(m: Any):
-    return (
-        inspect.isclass(m)
-        and issubclass(m, BaseModel)
-        and not m == BaseModel
-        and not m == SQLModel
-    )
+    # Cheapest rejects first, identity avoids the pydantic metaclass __eq__
+    if not isinstance(m, type) or m is BaseModel or m is SQLModel:
+        return False
+    return issubclass(m, BaseModel)
 
 
-def yield_models_by_file(
-    file: Path,
-    predicate: Callable[[Any], bool] = exportable_model,
-) -> Generator[BaseModel, None, None]:
+@lru_cache(maxsize=64)
+def _load_user_module(path: str, mtime_ns: int) -> ModuleType:
+    """Execute a models file, cached until the file is modified."""
+    file = Path(path)
     module_name = file.stem + "_dynamic"
     spec = importlib.util.spec_from_file_location(module_name, file)
     if spec is None or spec.loader is None:
         raise ImportError(f"Could not load module from {file}")
     module = importlib.util.module_from_spec(spec)
     spec.loader.exec_module(module)
-    for _, obj in inspect.getmembers(module, predicate=predicate):
-        yield obj
+    return module
+
+
+def yield_models_by_file(
+    file: Path,
+    predicate: Callable[[Any], bool] = exportable_model,
+) -> Generator[BaseModel, None, None]:
+    module = _load_user_module(str(file.resolve()), file.stat().st_mtime_ns)
+    for obj in module.__dict__.values():
+        if predicate(obj):
+            yield obj
@@ -1,9 +1,9 @@
+import sys
 from pathlib import Path
 from typing import NamedTuple
+from urllib.parse import urlsplit
 
 import click
-import typer
-from pydantic import PostgresDsn
 from shed.settings import (
     DatabaseConfig,
     SqliteConnection,
@@ -14,50 +14,63 @@ from shed.settings import (
 
 
 def parse_connection(value: str) -> "DBConnection":
-    from sqlalchemy.engine.url import make_url
-
-    parsed = make_url(value)
-    if parsed.drivername == "sqlite":
-        if not parsed.database:
-            raise typer.BadParameter("SQLite URI must include a path")
+    scheme, sep, rest = value.partition("://")
+    if not sep:
+        raise click.BadParameter(
+            "Connection must be a URI, e.g. sqlite:///site.db or postgres://..."
+        )
+    if scheme == "sqlite":
+        # sqlite:///relative/path.db or sqlite:////absolute/path.db
+        db_path = rest.partition("?")[0].partition("/")[2]
+        if not db_path:
+            raise click.BadParameter("SQLite URI must include a path")
         # Note that to be added to the settings, the path must be converted to an absolute path
         cfg = DatabaseConfig(
-            type="sqlite", connection=SqliteConnection(db_path=Path(parsed.database))
+            type="sqlite", connection=SqliteConnection(db_path=Path(db_path))
         )
 
-    elif parsed.drivername in {"postgresql", "postgres"}:
+    elif scheme in {"postgresql", "postgres"}:
         try:
-            dsn = PostgresDsn(value)
-            host = dsn.hosts()[0]
-        except Exception as err:
-            raise typer.BadParameter(f"PostgreSQL URI invalid: {err}")
+            parsed = urlsplit(value)
+            port = parsed.port
+        except ValueError as err:
+            raise click.BadParameter(f"PostgreSQL URI invalid: {err}")
+        host = parsed.hostname
+        if host and ":" in host:
+            # IPv6 address
+            host = f"[{host}]"
+        options = {
+            "host": host,
+            "port": port,
+            "username": parsed.username,
+            "password": parsed.password,
+            "database": parsed.path.lstrip("/"),
+        }
         cfg = DatabaseConfig(
             type="postgres",
-            connection=PostgresConnection(
-                host=host["host"],
-                port=host["port"] or 5432,
-                username=host["username"],
-                password=host["password"] or "postgres",
-                database=dsn.path.lstrip("/"),
-            ),
+            # Unset parts fall back to the connection defaults
+            connection=PostgresConnection(**{k: v for k, v in options.items() if v}),
         )
     else:
-        raise typer.BadParameter(
-            f"Unsupported scheme '{parsed.drivername}'. Only sqlite and postgresql/postgres are supported."
+        raise click.BadParameter(
+            f"Unsupported scheme '{scheme}'. Only sqlite and postgresql/postgres are supported."
         )
     return DBConnection(cfg)
 
 
 class DBConnection:
+    __slots__ = ("value", "_str")
+
     def __init__(self, value):
         self.value: DatabaseConfig | None = value
+        t = value.connection.type if value else "Empty"
+        self._str = f"DBConnection(type={t})"
 
     def __bool__(self):
         return bool(self.value)
 
     def __str__(self):
-        t = self.value.type if self.value else "Emtpy"
-        return f"DBConnection(type={t})"
+        return self._str
 
 
 class ProjectEnvironment(NamedTuple):
@@ -71,30 +84,33 @@ class ProjectEnvironment(NamedTuple):
 
 def parse_project_string(settings: Settings, value: str) -> ProjectEnvironment:
     """Validate and parse project.environment format."""
-    tokens = value.split(".")
-    if len(tokens) > 2:
-        raise typer.BadParameter(
+    head, sep, tail = value.rpartition(".")
+    if "." in head:
+        raise click.BadParameter(
             "Target must be in format 'project.environment' or 'project' (for development)"
         )
-    project_name, env_name = tokens if len(tokens) == 2 else (tokens[0], None)
-    if project_name not in settings.projects:
-        raise typer.BadParameter(
+    project_name, env_name = (head, tail) if sep else (value, None)
+    # Settings keys are interned, so are the names looked up in them
+    project_name = sys.intern(project_name)
+    if env_name:
+        env_name = sys.intern(env_name)
+    project_config = settings.projects.get(project_name)
+    if project_config is None:
+        raise click.BadParameter(
             f"Project '{project_name}' not found in projects.",
         )
 
-    project_config = settings.projects[project_name]
-
     if env_name:
-        if env_name not in project_config.db:
-            raise typer.BadParameter(
+        db_config = project_config.db.get(env_name)
+        if db_config is None:
+            raise click.BadParameter(
                 f"Project '{project_name}' has no environment named '{env_name}'"
             )
-        db_config = project_config.db[env_name]
     else:
         # Try to auto-detect development database
         dev_db = settings.get_dev_db(project_name)
         if not dev_db:
-            raise typer.BadParameter(
+            raise click.BadParameter(
                 f"Could not determine development database for project '{project_name}'. "
                 f"Either specify environment explicitly (e.g., '{project_name}.env'), "
                 f"or ensure there is exactly one database named '{project_name}', 'dev*', or '*dev'."
@@ -113,5 +129,12 @@ class ProjectEnvironParser(click.ParamType):
     name = "ProjectEnvironment"
 
     def convert(self, value, param, ctx):
-        settings: Settings = ctx.obj["settings"]
-        return parse_project_string(settings, value)
+        if isinstance(value, ProjectEnvironment):
+            return value
+        # ctx.meta is shared by the whole invocation, arguments naming the
+        # same target (e.g. clone) are parsed once
+        parsed: dict[str, ProjectEnvironment] = ctx.meta.setdefault("shed.targets", {})
+        if value not in parsed:
+            settings: Settings = ctx.obj["settings"]
+            parsed[value] = parse_project_string(settings, value)
+        return parsed[value]
@@ -1,10 +1,11 @@
 """Settings models for schema management."""
 
-from functools import partial
+import sys
+from collections.abc import Iterator
+from functools import lru_cache
 from pathlib import Path
-from typing import Literal
+from typing import Any, ClassVar, Literal
 
-import yaml
 from pydantic import (
     BaseModel as PydanticBaseModel,
     Field,
@@ -12,16 +13,45 @@ from pydantic import (
     model_validator,
     model_serializer,
     ConfigDict,
+    PrivateAttr,
 )
 from urllib.parse import quote_plus
 
 from pydantic_core.core_schema import SerializerFunctionWrapHandler
 
 from shed.constants import DEFAULT_SETTINGS_FN
+from shed.utils import dump_json, load_json
 
 ConvertMode = Literal["abs", "rel"]
 
 
+def _yaml_load(stream) -> Any:
+    # yaml is imported on demand, the json cache usually makes it unnecessary
+    import yaml
+
+    try:
+        # libyaml bindings, much faster than the pure python implementation
+        from yaml import CSafeLoader as Loader
+    except ImportError:
+        from yaml import SafeLoader as Loader
+    return yaml.load(stream, Loader=Loader)
+
+
+def _yaml_dump(data: Any, stream) -> None:
+    import yaml
+
+    try:
+        from yaml import CSafeDumper as Dumper
+    except ImportError:
+        from yaml import SafeDumper as Dumper
+    yaml.dump(data, stream, Dumper=Dumper, default_flow_style=False, indent=2)
+
+
+def _intern_keys(value: dict[str, Any]) -> dict[str, Any]:
+    # Interned keys let lookups with interned names compare by identity
+    return {sys.intern(k): v for k, v in value.items()}
+
+
 def convert_abs(root: Path, value: Path):
     return value if value.is_absolute() else root / value
 
@@ -31,9 +61,9 @@ def convert_rel(root: Path, value: Path):
 
 
 def path_convert(root: Path, value: Path, mode: ConvertMode) -> Path:
-    return {"abs": partial(convert_abs, root), "rel": partial(convert_rel, root)}[mode](
-        value
-    )
+    if mode == "abs":
+        return convert_abs(root, value)
+    return convert_rel(root, value)
 
 
 class BaseModel(PydanticBaseModel):
@@ -41,11 +71,21 @@ class BaseModel(PydanticBaseModel):
 
 
 class SettingsRelPaths(PydanticBaseModel):
+    # Names of the Path typed fields, collected once per subclass
+    _path_fields: ClassVar[tuple[str, ...]] = ()
+
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs: Any) -> None:
+        super().__pydantic_init_subclass__(**kwargs)
+        cls._path_fields = tuple(
+            name
+            for name, f_info in cls.model_fields.items()
+            if f_info.annotation is Path
+        )
+
     def _convert_paths(self, path: Path, mode: Literal["rel", "abs"] = "rel"):
-        for name, f_info in self.__class__.model_fields.items():
-            if f_info.annotation == Path:
-                new_val = path_convert(path, getattr(self, name), mode)
-                setattr(self, name, new_val)
+        for name in self._path_fields:
+            setattr(self, name, path_convert(path, getattr(self, name), mode))
 
 
 class SqliteConnection(SettingsRelPaths):
@@ -111,6 +151,13 @@ class ProjectConfig(SettingsRelPaths):
     )
     db: dict[str, DatabaseConfig] = Field(..., description="Database environments")
 
+    @field_validator("db")
+    @classmethod
+    def intern_env_names(
+        cls, v: dict[str, DatabaseConfig]
+    ) -> dict[str, DatabaseConfig]:
+        return _intern_keys(v)
+
     @property
     def versions_dir(self):
         return self.migrations_dir / "versions"
@@ -125,6 +172,59 @@ class ProjectConfig(SettingsRelPaths):
             db.connection._convert_paths(path, mode)
 
 
+@lru_cache(maxsize=8)
+def _read_settings_data(settings_path: str, mtime_ns: int, size: int) -> dict:
+    """Reads the raw settings data, memoized per file version.
+
+    The result is shared between calls and must not be mutated, validation
+    builds new objects from it.
+    """
+    path = Path(settings_path)
+    data = _read_json_cache(path, mtime_ns, size)
+    if data is None:
+        with open(path, encoding="utf-8") as f:
+            data = _yaml_load(f)
+        # e.g. the yaml was edited by hand since the cache was written
+        try:
+            _write_json_cache(path, mtime_ns, size, dump_json(data))
+        except (TypeError, ValueError):
+            pass
+    return data
+
+
+def _json_cache_header(mtime_ns: int, size: int) -> bytes:
+    return b"%d %d\n" % (mtime_ns, size)
+
+
+def _read_json_cache(settings_path: Path, mtime_ns: int, size: int) -> dict | None:
+    """Returns the cached settings data if it was written for this yaml file.
+
+    The first line of the cache holds the mtime and size of the yaml it was
+    written for, any other version of the yaml (even an older one)
+    invalidates it without parsing the rest.
+    """
+    cache_path = Settings.cache_path_for(settings_path)
+    try:
+        with open(cache_path, "rb") as f:
+            if f.readline() != _json_cache_header(mtime_ns, size):
+                return None
+            data = load_json(f.read())
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _write_json_cache(
+    settings_path: Path, mtime_ns: int, size: int, json_dump: bytes
+) -> None:
+    try:
+        Settings.cache_path_for(settings_path).write_bytes(
+            _json_cache_header(mtime_ns, size) + json_dump
+        )
+    except OSError:
+        pass
+
+
 def default_settings_path() -> Path:
     return Path(".") / DEFAULT_SETTINGS_FN
 
@@ -134,32 +234,62 @@ class Settings(BaseModel):
 
     projects: dict[str, ProjectConfig] = Field(default_factory=dict)
 
+    @field_validator("projects")
+    @classmethod
+    def intern_project_names(
+        cls, v: dict[str, ProjectConfig]
+    ) -> dict[str, ProjectConfig]:
+        return _intern_keys(v)
+
     settings_path: Path | None = None
 
+    # (settings_path, absolute parent) of the last root_dir lookup
+    _root_cache: tuple[Path, Path] | None = PrivateAttr(default=None)
+    # (project name, module) pairs, reset when projects or paths change
+    _code_files: tuple[tuple[str, Path], ...] | None = PrivateAttr(default=None)
+
+    @property
+    def root_dir(self) -> Path:
+        """Absolute directory of the settings file, paths are stored relative to it."""
+        cached = self._root_cache
+        if cached is None or cached[0] is not self.settings_path:
+            cached = (self.settings_path, self.settings_path.parent.absolute())
+            self._root_cache = cached
+        return cached[1]
+
     def add_project(self, project_name: str, code_path: Path) -> ProjectConfig:
         if not code_path.is_absolute():
             raise ValueError("code_path must be absolute")
         if project_name not in self.projects:
             self.projects[project_name] = ProjectConfig(module=code_path, db={})
+            self._code_files = None
         return self.projects[project_name]
 
+    @staticmethod
+    def cache_path_for(settings_path: Path) -> Path:
+        """JSON copy of the settings file, kept up to date to speed up loading."""
+        return settings_path.with_name(settings_path.name + ".cache")
+
     @classmethod
     def from_file(cls, settings_path: Path) -> "Settings":
         """Load settings from file."""
-        if not settings_path.exists():
+        try:
+            st = settings_path.stat()
+        except FileNotFoundError:
             # Create default settings file
             settings = cls(settings_path=settings_path)
             settings.save()
             return settings
-        with open(settings_path, encoding="utf-8") as f:
-            data = yaml.safe_load(f)
-
+        data = _read_settings_data(str(settings_path), st.st_mtime_ns, st.st_size)
         settings = cls(**data, settings_path=settings_path)
         return settings
 
-    def all_code_files(self):
-        for name, project in self.projects.items():
-            yield name, project.module
+    def all_code_files(self) -> tuple[tuple[str, Path], ...]:
+        if self._code_files is None:
+            self._code_files = tuple(
+                (name, project.module) for name, project in self.projects.items()
+            )
+        return self._code_files
 
     def get_dev_db(self, project_name: str) -> DatabaseConfig | None:
         """Get development database for a project.
@@ -179,8 +309,8 @@ class Settings(BaseModel):
         # Look for dev* or *dev patterns
         dev_candidates = [
             env_name
-            for env_name in project.db.keys()
-            if env_name.lower().startswith("dev") or env_name.lower().endswith("dev")
+            for env_name, lowered in zip(project.db, map(str.lower, project.db))
+            if lowered.startswith("dev") or lowered.endswith("dev")
         ]
 
         # Return the db if exactly one dev candidate found
@@ -198,14 +328,23 @@ class Settings(BaseModel):
         # Ensure directory exists
         self.settings_path.parent.mkdir(exist_ok=True)
 
-        # Re-validate
-        data_dump = self.model_dump(exclude={"settings_path"}, mode="json")
-        self.__class__(**data_dump)
+        # Dumped from a validated instance, no need to validate it again. The
+        # JSON dump runs in pydantic-core and doubles as the cache content.
+        json_dump = self.model_dump_json(exclude={"settings_path"}).encode()
         with open(self.settings_path, "w", encoding="utf-8") as f:
-            yaml.dump(data_dump, f, default_flow_style=False, indent=2)
+            _yaml_dump(load_json(json_dump), f)
+        st = self.settings_path.stat()
+        _write_json_cache(self.settings_path, st.st_mtime_ns, st.st_size, json_dump)
+
+    def _path_owners(self) -> Iterator[SettingsRelPaths]:
+        for proj in self.projects.values():
+            yield proj
+            for db in proj.db.values():
+                yield db.connection
 
     def _convert_paths(self, mode: Literal["rel", "abs"] = "rel"):
-        root = self.settings_path.parent.absolute()
+        root = self.root_dir
+        self._code_files = None
         for proj in self.projects.values():
             proj._convert_paths(root, mode)
 
@@ -215,10 +354,19 @@ class Settings(BaseModel):
     ) -> dict[str, object]:
         if not self.settings_path:
             return handler(self)
-        a_copy = self.model_copy(deep=True)
-        a_copy._convert_paths(mode="rel")
-        serialized = handler(a_copy)
-        return serialized
+        # Serialize relative paths in place instead of on a deep copy, the
+        # original path objects are put back afterwards.
+        originals = [
+            (owner, name, getattr(owner, name))
+            for owner in self._path_owners()
+            for name in owner._path_fields
+        ]
+        try:
+            self._convert_paths(mode="rel")
+            return handler(self)
+        finally:
+            for owner, name, value in originals:
+                setattr(owner, name, value)
 
     @model_validator(mode="after")
     def validate_paths(self):
@@ -15,6 +15,8 @@ from {{ models_import_path }} import *
 from sqlmodel import SQLModel
 import re
 
+_TENANT_RE = re.compile(r"[a-z_]+")
+
 target_metadata = SQLModel.metadata
 
 config = context.config
@@ -33,10 +35,9 @@ def get_dsn_from_env():
 def get_tenant() -> str | None:
     schema = os.getenv("SHED_CURRENT_SCHEMA", "")
     if schema:
-        m = re.match(r"^[a-z_]+$", schema)
-        if not m:
+        if not _TENANT_RE.fullmatch(schema):
             raise ValueError(f"schema is not valid: {schema}")
-        return m.group(0)
+        return schema
     return None
 
 
@@ -65,17 +66,22 @@ def include_object_default(obj, name, type_, reflected, compare_to):
 
 def include_object_sqlite(obj, name, type_, reflected, compare_to):
     obj_schema = getattr(obj, "schema", None)
-    log.info(f"include_object_sqlite: {name=}, {type_=}, {reflected=}, {compare_to=}, {obj_schema=}")
+    # Called for every compared object during autogenerate
+    if log.isEnabledFor(logging.INFO):
+        log.info(f"include_object_sqlite: {name=}, {type_=}, {reflected=}, {compare_to=}, {obj_schema=}")
     if obj_schema:
-        log.warning(f"table {name} excluded since sqlite can not handle schemas")
+        log.warning("table %s excluded since sqlite can not handle schemas", name)
         return False
     return True
 
 
+_INCLUDE_FUNCS = {
+    "sqlite": include_object_sqlite
+}
+
+
 def get_include_func(db_type: str):
-    return {
-        "sqlite": include_object_sqlite
-    }.get(db_type, include_object_default)
+    return _INCLUDE_FUNCS.get(db_type, include_object_default)
 
 
 def run_migrations_offline() -> None:
@@ -1,38 +1,70 @@
 import contextlib
+import json
 import os
 import shutil
 import subprocess
+from functools import lru_cache
 from pathlib import Path
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 @contextlib.contextmanager
-def cd_to_directory(path: Path, env: dict | None = None):
-    """Changes working directory and returns to previous on exit."""
-    prev_cwd = Path.cwd()
-    os.chdir(path)
+def env_override(**variables: str):
+    """Sets environment variables and restores their previous values on exit.
+
+    Only the given keys are touched, the rest of the environment is not copied.
+    """
+    prev = {key: os.environ.get(key) for key in variables}
+    os.environ.update(variables)
     try:
         yield
     finally:
-        os.chdir(prev_cwd)
+        for key, value in prev.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+@lru_cache(maxsize=1)
+def find_ruff() -> str | None:
+    """Locate the ruff binary on PATH, or the one shipped with the ruff package."""
+    ruff = shutil.which("ruff")
+    if ruff is not None:
+        return ruff
+    try:
+        from ruff.__main__ import find_ruff_bin
+    except ImportError:
+        return None
+    try:
+        return os.fsdecode(find_ruff_bin())
+    except FileNotFoundError:
+        return None
 
 
 def is_ruff_available() -> bool:
     """Check if ruff is available in the current environment."""
-    return shutil.which("ruff") is not None
+    return find_ruff() is not None
 
 
-def format_with_ruff(file_path: Path) -> bool:
+def format_with_ruff(*file_paths: Path) -> bool:
     """
-    Format a file with ruff.
+    Format files with ruff, all in a single ruff invocation.
 
     Returns True if formatting was successful, False otherwise.
     """
-    if not is_ruff_available():
+    ruff = find_ruff()
+    if ruff is None or not file_paths:
         return False
 
     try:
         result = subprocess.run(
-            ["ruff", "format", str(file_path)],
+            [ruff, "format", *map(str, file_paths)],
             capture_output=True,
             text=True,
             timeout=30,
@@ -40,3 +72,25 @@ def format_with_ruff(file_path: Path) -> bool:
         return result.returncode == 0
     except (subprocess.SubprocessError, FileNotFoundError):
         return False
+
+
+def dump_json(data: Any, indent: int | None = None) -> bytes:
+    """
+    Serialize data to JSON bytes, using orjson if it is installed.
+
+    orjson only supports an indentation of two spaces, other values fall back
+    to the standard library, formatted like orjson does.
+    """
+    if orjson is not None and indent in (None, 2):
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+    separators = (",", ":") if indent is None else None
+    return json.dumps(
+        data, indent=indent, separators=separators, ensure_ascii=False
+    ).encode()
+
+
+def load_json(data: bytes) -> Any:
+    """Parse JSON bytes, using orjson if it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -1,10 +1,10 @@
+import os
 import shutil
-import tempfile
 from os import getenv
 from pathlib import Path
 from traceback import print_tb
+from typing import TYPE_CHECKING, ClassVar
 
-import psycopg2
 import pytest
 import yaml
 from typer.testing import CliRunner as BaseCliRunner
@@ -12,7 +12,13 @@ from typer.testing import CliRunner as BaseCliRunner
 from shed.constants import SETTINGS_PATH_ENV_VAR, DEFAULT_SETTINGS_FN
 from shed.custom_types import parse_project_string
 from shed.settings import PostgresConnection, Settings
-from shed.utils import cd_to_directory
+
+if TYPE_CHECKING:
+    # psycopg2 is imported where it is used, only the postgres tests need it
+    from psycopg2.pool import SimpleConnectionPool
+
+
+YamlDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
 
 
 class CliRunner(BaseCliRunner):
@@ -28,11 +34,9 @@ class CliRunner(BaseCliRunner):
 
 
 @pytest.fixture
-def temp_settings_dir():
-    """Create a temporary directory for settings."""
-    temp_dir = Path(tempfile.mkdtemp())
-    yield temp_dir
-    shutil.rmtree(temp_dir)
+def temp_settings_dir(tmp_path):
+    """Temporary directory for settings, cleaned up by pytest."""
+    return tmp_path
 
 
 @pytest.fixture
@@ -44,17 +48,39 @@ def cli_settings_path(temp_settings_dir, monkeypatch):
 
 
 @pytest.fixture
-def cli_settings(cli_settings_path, monkeypatch, sample_settings_data):
+def cli_settings(
+    cli_settings_path, monkeypatch, sample_settings_data, sample_settings_yaml
+):
     """Create settings for CLI testing with environment variable set."""
-    # Return loaded settings instance
-    cli_settings_path.write_text(yaml.safe_dump(sample_settings_data))
-    s = Settings.from_file(cli_settings_path)
-    return s
+    # The CLI reads the file, the returned instance is built from the same data
+    cli_settings_path.write_text(sample_settings_yaml)
+    return Settings.model_validate(
+        {**sample_settings_data, "settings_path": cli_settings_path}
+    )
+
+
+@pytest.fixture(scope="module")
+def cli_settings_ro(
+    request, tmp_path_factory, sample_settings_data, sample_settings_yaml
+):
+    """Like cli_settings, shared by a module for tests that never write files."""
+    # One directory per module, no need for pytest's numbered directories
+    ro_dir = tmp_path_factory.mktemp(f"ro_{request.module.__name__}", numbered=False)
+    settings_path = ro_dir / "test_settings.yaml"
+    settings_path.write_text(sample_settings_yaml)
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv(SETTINGS_PATH_ENV_VAR, str(settings_path))
+        yield Settings.model_validate(
+            {**sample_settings_data, "settings_path": settings_path}
+        )
 
 
-@pytest.fixture
-def sample_settings_data(temp_settings_dir):
-    """Sample settings data for testing."""
+@pytest.fixture(scope="session")
+def sample_settings_data():
+    """Sample settings data for testing, shared by all tests: do not mutate.
+
+    Relative paths resolve against the directory of the settings file.
+    """
     return {
         "projects": {
             "projectA": {
@@ -62,14 +88,14 @@ def sample_settings_data(temp_settings_dir):
                 "db": {
                     "projectA": {
                         "connection": {
-                            "db_path": str(temp_settings_dir / "shed-dev.sqlite"),
+                            "db_path": "shed-dev.sqlite",
                             "type": "sqlite",
                         },
                     },
                     "staging": {
                         "connection": {
                             "type": "sqlite",
-                            "db_path": str(temp_settings_dir / "staging.sqlite"),
+                            "db_path": "staging.sqlite",
                         },
                     },
                     "prod": {
@@ -88,17 +114,23 @@ def sample_settings_data(temp_settings_dir):
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
+def sample_settings_yaml(sample_settings_data) -> str:
+    """sample_settings_data dumped to yaml."""
+    return yaml.dump(sample_settings_data, Dumper=YamlDumper)
+
+
+@pytest.fixture(scope="session")
 def runner():
     """Create CLI test runner."""
     return CliRunner()
 
 
 @pytest.fixture
-def temp_dir_runner(temp_settings_dir):
-    """Create CLI test runner."""
-    with cd_to_directory(temp_settings_dir):
-        yield CliRunner()
+def temp_dir_runner(temp_settings_dir, monkeypatch):
+    """Create CLI test runner working in the settings directory."""
+    monkeypatch.chdir(temp_settings_dir)
+    return CliRunner()
 
 
 def get_db_host():
@@ -108,13 +140,47 @@ def get_db_host():
 def copy_project_files(project_name: str, temp_settings_dir) -> Path:
     """Copies a test project in a temp dir"""
     fixtures_dir = Path(__file__).parent / "fixtures"
-    shutil.copytree(fixtures_dir, temp_settings_dir, dirs_exist_ok=True)
+    shutil.copytree(
+        fixtures_dir,
+        temp_settings_dir,
+        dirs_exist_ok=True,
+        ignore=lambda src, names: [n for n in names if n.endswith(".yml")],
+    )
     target_config = temp_settings_dir / DEFAULT_SETTINGS_FN
-    shutil.move(temp_settings_dir / f"{project_name}.yml", target_config)
+    shutil.copyfile(fixtures_dir / f"{project_name}.yml", target_config)
     return target_config
 
 
+PREPARED_QUERIES = (
+    """
+    PREPARE tables_in_schema AS
+        SELECT table_name
+        FROM information_schema.tables
+        WHERE table_schema = $1
+        ORDER BY table_name
+    """,
+    """
+    PREPARE table_exists_in_schema AS
+        SELECT EXISTS (
+            SELECT FROM information_schema.tables
+            WHERE table_schema = $1
+            AND table_name = $2
+        )
+    """,
+    """
+    PREPARE table_exists AS
+        SELECT EXISTS (
+            SELECT FROM information_schema.tables
+            WHERE table_name = $1
+        )
+    """,
+)
+
+
 class ProjectHelper:
+    # Autocommit connection pools shared by all helpers, keyed by endpoint
+    _pools: ClassVar[dict[tuple, "SimpleConnectionPool"]] = {}
+
     def __init__(self, settings: Settings, project_name: str):
         self.settings = settings
         dev_db = settings.get_dev_db(project_name)
@@ -151,45 +217,74 @@ class ProjectHelper:
     def _get_connection(self):
         """Get or create a database connection."""
         if not self._connection or self._connection.closed:
+            import psycopg2
+
             self._connection = psycopg2.connect(**self._get_conn_params())
             self._connection.autocommit = False
+            self._prepare_queries(self._connection)
         return self._connection
 
-    def set_search_path(self, schema_name: str):
-        """Set the search_path for the current connection to target a specific schema."""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute(f'SET search_path TO "{schema_name}"')
-            conn.commit()
-        finally:
-            cursor.close()
+    @staticmethod
+    def _prepare_queries(conn):
+        """Prepare the information_schema lookups once per connection."""
+        with conn.cursor() as cursor:
+            for sql in PREPARED_QUERIES:
+                cursor.execute(sql)
+        conn.commit()
 
-    def _run_sql(self, sql: str):
+    def _run_sql(self, *statements: str):
+        """Run the statements in a single transaction."""
         conn = self._get_connection()
         cursor = conn.cursor()
         try:
-            cursor.execute(sql)
+            for sql in statements:
+                cursor.execute(sql)
             conn.commit()
         finally:
             cursor.close()
 
-    def _run_sql_with_autocommit(self, sql: str, database: str | None = None):
-        """Run SQL with autocommit enabled (for DDL operations like DROP DATABASE)."""
-        conn = psycopg2.connect(**self._get_conn_params(database))
-        conn.autocommit = True
-        cursor = conn.cursor()
+    def _get_pool(self, database: str | None = None) -> "SimpleConnectionPool":
+        from psycopg2.pool import SimpleConnectionPool
+
+        params = self._get_conn_params(database)
+        key = (params["host"], params["port"], params["user"], params["database"])
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = self._pools[key] = SimpleConnectionPool(1, 2, **params)
+        return pool
+
+    @classmethod
+    def close_pools(cls):
+        for pool in cls._pools.values():
+            pool.closeall()
+        cls._pools.clear()
+
+    def _run_sql_with_autocommit(self, *statements: str, database: str | None = None):
+        """Run SQL statements with autocommit enabled (for DDL like DROP DATABASE).
+
+        Uses pooled connections, only pass a database other than the current one
+        (e.g. 'postgres'), open connections to a database prevent dropping it.
+        """
+        pool = self._get_pool(database)
+        conn = pool.getconn()
         try:
-            cursor.execute(sql)
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
         finally:
-            cursor.close()
-            conn.close()
+            pool.putconn(conn)
 
     def create_schema(self, name: str):
         """Create a PostgreSQL schema."""
-        self._run_sql(f'CREATE SCHEMA IF NOT EXISTS "{name}"')
-        if name not in self.created_schemas:
-            self.created_schemas.append(name)
+        self.create_schemas(name)
+
+    def create_schemas(self, *names: str):
+        """Create PostgreSQL schemas in a single transaction."""
+        self._run_sql(*(f'CREATE SCHEMA IF NOT EXISTS "{name}"' for name in names))
+        for name in names:
+            if name not in self.created_schemas:
+                self.created_schemas.append(name)
 
     def drop_schema(self, name: str):
         """Drop a PostgreSQL schema."""
@@ -200,16 +295,13 @@ class ProjectHelper:
     def teardown(self):
         """Clears the database for all operations made."""
         self._close_connection()
-        # Connect to 'postgres' database to drop/recreate the target database
-        for sql in (
+        # Connect to 'postgres' database to drop/recreate the target database,
+        # the recreated database starts without an alembic_version table
+        self._run_sql_with_autocommit(
             f'DROP DATABASE IF EXISTS "{self.current_db_conn.database}"',
             f'CREATE DATABASE "{self.current_db_conn.database}"',
-            "DROP TABLE IF EXISTS public.alembic_version"
-        ):
-            self._run_sql_with_autocommit(
-                sql,
-                database="postgres",
-            )
+            database="postgres",
+        )
 
     def select_target(self, target: str):
         """Select a db connection as you would with shed myproject.env or myproject."""
@@ -219,9 +311,12 @@ class ProjectHelper:
             raise ValueError(
                 f"ProjectHelper requires a PostgreSQL database, got {pr_env.db_config.connection.type}"
             )
+        previous_params = self._get_conn_params()
         self.current_db_conn = pr_env.db_config.connection
         self.current_target = target
-        self._close_connection()
+        # Targets often only differ by schema, keep the connection if possible
+        if self._get_conn_params() != previous_params:
+            self._close_connection()
 
     @property
     def versions_dir(self):
@@ -229,12 +324,15 @@ class ProjectHelper:
         return self.settings.projects[self.project_name].versions_dir
 
     @property
-    def revision_files(self):
-        return sorted(
-            self.versions_dir.glob("*.py"),
-            key=lambda x: x.stat().st_mtime,
-            reverse=True,
-        )
+    def revision_files(self) -> list[Path]:
+        """Revision files, most recently modified first."""
+        with os.scandir(self.versions_dir) as entries:
+            by_mtime = [
+                (entry.stat().st_mtime_ns, entry.path)
+                for entry in entries
+                if entry.name.endswith(".py") and entry.is_file()
+            ]
+        return [Path(path) for _, path in sorted(by_mtime, reverse=True)]
 
     @property
     def last_revision_content(self):
@@ -245,14 +343,17 @@ class ProjectHelper:
             file.unlink()
 
     def create_dummy_table(self, name, schema="public"):
-        self.set_search_path(schema)
-        self._run_sql(f"""
+        # SET LOCAL only applies to this transaction, the session keeps its path
+        self._run_sql(
+            f'SET LOCAL search_path TO "{schema}"',
+            f"""
         CREATE TABLE "{name}" (
           id SERIAL NOT NULL, 
           name VARCHAR NOT NULL, 
           PRIMARY KEY (id)
         );
-        """)
+        """,
+        )
 
     def _query_sql(self, sql: str, params: tuple = ()) -> list:
         """Execute a SQL query and return results."""
@@ -266,36 +367,17 @@ class ProjectHelper:
 
     def get_tables_in_schema(self, schema_name: str) -> list[str]:
         """Get all tables in a specific schema."""
-        self.set_search_path(schema_name)
-        sql = """
-            SELECT table_name 
-            FROM information_schema.tables 
-            WHERE table_schema = %s 
-            ORDER BY table_name
-        """
-        results = self._query_sql(sql, (schema_name,))
+        results = self._query_sql("EXECUTE tables_in_schema (%s)", (schema_name,))
         return [row[0] for row in results] if results else []
 
     def table_exists(self, table_name: str, schema_name: str | None = None) -> bool:
         """Check if a table exists in a specific schema."""
         if schema_name:
-            self.set_search_path(schema_name)
-            sql = """
-                SELECT EXISTS (
-                    SELECT FROM information_schema.tables 
-                    WHERE table_schema = %s 
-                    AND table_name = %s
-                )
-            """
-            results = self._query_sql(sql, (schema_name, table_name))
+            results = self._query_sql(
+                "EXECUTE table_exists_in_schema (%s, %s)", (schema_name, table_name)
+            )
         else:
-            sql = """
-                SELECT EXISTS (
-                    SELECT FROM information_schema.tables 
-                    WHERE table_name = %s
-                )
-            """
-            results = self._query_sql(sql, (table_name,))
+            results = self._query_sql("EXECUTE table_exists (%s)", (table_name,))
         return results[0][0] if results else False
 
 
@@ -303,7 +385,17 @@ class ProjectHelper:
 def pg_schemas_project(temp_settings_dir):
     config_path = copy_project_files("pg_schemas", temp_settings_dir)
     helper = ProjectHelper(Settings.from_file(config_path), "lab")
-    helper.create_schema("aviation")
-    helper.create_schema("prod")
+    helper.create_schemas("aviation", "prod")
     yield helper
     helper.teardown()
+
+
+def pytest_configure(config):
+    # Keep the many small temp files of the CLI tests in memory when possible
+    shm = "/dev/shm"
+    if os.path.isdir(shm) and os.access(shm, os.W_OK | os.X_OK):
+        os.environ.setdefault("PYTEST_DEBUG_TEMPROOT", shm)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    ProjectHelper.close_pools()
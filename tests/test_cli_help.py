@@ -1,23 +1,59 @@
 """Tests for CLI help functionality."""
 
-from shed.cli import app
+import subprocess
+import sys
+
+import pytest
 
+from shed.cli import app
 
-def test_main_help(runner, cli_settings):
-    """Test main help command."""
-    result = runner.invoke(app, ["--help"])
+HELP_CASES = {
+    (): [
+        "A command line tool for managing database schemas and migrations",
+        "init",
+        "migrate",
+        "clone",
+        "--settings-path",
+    ],
+    ("init",): [
+        "Initialize migration folder for a project",
+        "project_name",
+        "--force",
+    ],
+    ("migrate",): ["Run database migrations", "target", "--dry-run", "--revision"],
+    ("clone",): [
+        "Clone database from source to target",
+        "source",
+        "target",
+        "--dry-run",
+    ],
+}
+
+
+@pytest.fixture(scope="module")
+def help_results(runner, cli_settings_ro):
+    """Help output per command, invoked once for the whole module.
+
+    Subcommand help runs the main callback, which loads the settings file.
+    """
+    return {cmd: runner.invoke(app, [*cmd, "--help"]) for cmd in HELP_CASES}
+
+
+@pytest.mark.parametrize(
+    "command, needles",
+    HELP_CASES.items(),
+    ids=[" ".join(cmd) or "main" for cmd in HELP_CASES],
+)
+def test_help(help_results, command, needles):
+    """Test the help of the main command and the subcommands."""
+    result = help_results[command]
 
     assert result.exit_code == 0
-    assert (
-        "A command line tool for managing database schemas and migrations"
-        in result.stdout
-    )
-    assert "init" in result.stdout
-    assert "migrate" in result.stdout
-    assert "clone" in result.stdout
+    missing = [needle for needle in needles if needle not in result.stdout]
+    assert not missing, f"Not found in help output: {missing}"
 
 
-def test_no_args_shows_help(runner, cli_settings):
+def test_no_args_shows_help(runner, cli_settings_ro):
     """Test that running with no args shows help."""
     result = runner.invoke(app, [])
 
@@ -25,41 +61,13 @@ def test_no_args_shows_help(runner, cli_settings):
     assert "Usage:" in result.stdout
 
 
-def test_init_help(runner, cli_settings):
-    """Test init command help."""
-    result = runner.invoke(app, ["init", "--help"])
-
-    assert result.exit_code == 0
-    assert "Initialize migration folder for a project" in result.stdout
-    assert "project_name" in result.stdout
-    assert "--force" in result.stdout
-
-
-def test_migrate_help(runner, cli_settings):
-    """Test migrate command help."""
-    result = runner.invoke(app, ["migrate", "--help"])
-
-    assert result.exit_code == 0
-    assert "Run database migrations" in result.stdout
-    assert "target" in result.stdout
-    assert "--dry-run" in result.stdout
-    assert "--revision" in result.stdout
-
-
-def test_clone_help(runner, cli_settings):
-    """Test clone command help."""
-    result = runner.invoke(app, ["clone", "--help"])
-
-    assert result.exit_code == 0
-    assert "Clone database from source to target" in result.stdout
-    assert "source" in result.stdout
-    assert "target" in result.stdout
-    assert "--dry-run" in result.stdout
-
-
-def test_settings_path_option(runner, cli_settings):
-    """Test settings path option in help."""
-    result = runner.invoke(app, ["--help"])
-
-    assert result.exit_code == 0
-    assert "--settings-path" in result.stdout
+def test_cli_import_skips_database_libraries():
+    """Help and argument errors must not pay for importing the migration stack."""
+    code = (
+        "import sys, shed.cli; "
+        "print(sorted({'alembic', 'sqlalchemy', 'sqlmodel', 'yaml'} & set(sys.modules)))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "[]"
@@ -4,7 +4,11 @@ import pytest
 
 from shed.cli import app
 from tests.conftest import get_db_host
-import re
+
+pytestmark = pytest.mark.skipif(
+    condition=not get_db_host(),
+    reason="environment variable for testing with postgres not set",
+)
 
 
 def revision(runner, target, msg):
@@ -28,10 +32,6 @@ def migrate(runner, target):
     )
 
 
-@pytest.mark.skipif(
-    condition=not get_db_host(),
-    reason="environment variable for testing with postgres not set",
-)
 def test_pg_no_schema(temp_dir_runner, pg_schemas_project):
     """Test postgres migration using sample_settings_data."""
     pr = pg_schemas_project
@@ -52,7 +52,6 @@ def test_pg_no_schema(temp_dir_runner, pg_schemas_project):
         ],
     )
     assert r.exit_code == 0
-    print(r.stdout)
     assert commit_msg in r.stdout
 
     # The command might fail if postgres is not running, so we check for either success
@@ -68,13 +67,12 @@ def test_pg_no_schema(temp_dir_runner, pg_schemas_project):
     assert "Initial postgres migration" in content
     assert "def upgrade()" in content
     assert "def downgrade()" in content
-    print(content)
     assert "op.drop_table('flight', schema='aviation')" in content, (
         "Must contain the schema if on the model"
     )
-    tables = re.findall(r"op\.create_table", content)
+    created_tables = content.count("op.create_table")
     assert not pr.current_db_conn.schema_name
-    assert len(tables) == 3, (
+    assert created_tables == 3, (
         "All tables should be added since not schema is selected for the target"
     )
 
@@ -108,10 +106,6 @@ def test_pg_no_schema(temp_dir_runner, pg_schemas_project):
     )
 
 
-@pytest.mark.skipif(
-    condition=not get_db_host(),
-    reason="environment variable for testing with postgres not set",
-)
 def test_no_schema(temp_dir_runner, pg_schemas_project):
     """Test postgres migration using sample_settings_data."""
     pr = pg_schemas_project
@@ -126,10 +120,6 @@ def test_no_schema(temp_dir_runner, pg_schemas_project):
     assert "foobar" in content, "Would drop the table if not added by migrations"
 
 
-@pytest.mark.skipif(
-    condition=not get_db_host(),
-    reason="environment variable for testing with postgres not set",
-)
 def test_schema_prod(temp_dir_runner, pg_schemas_project):
     pr = pg_schemas_project
     pr.create_dummy_table("foobar", schema="public")
@@ -151,7 +141,6 @@ def test_schema_prod(temp_dir_runner, pg_schemas_project):
     assert "INSERT INTO alembic_version" in r.stdout, (
         "We set the search path on migration, should not include the tenant in sql"
     )
-    print(r.stdout)
     r = migrate(temp_dir_runner, target)
     assert r.exit_code == 0
 
@@ -1,15 +1,20 @@
 """Tests for settings module."""
 
+import os
+import shutil
 from pathlib import Path
 
 import yaml
 
+from shed import settings as settings_module
 from shed.settings import (
     DatabaseConfig,
     Settings,
     SqliteConnection,
     PostgresConnection,
+    _read_settings_data,
 )
+from tests.conftest import YamlDumper
 
 
 def test_sqlite_config_valid():
@@ -36,7 +41,9 @@ def test_empty_settings_creation():
     assert settings.projects == {}
 
 
-def test_settings_path_handling(sample_settings_data, temp_settings_dir):
+def test_settings_path_handling(
+    sample_settings_data, sample_settings_yaml, temp_settings_dir
+):
     # Load without settings path
     s = Settings(**sample_settings_data)
     assert not s.projects["projectA"].module.is_absolute()
@@ -46,9 +53,8 @@ def test_settings_path_handling(sample_settings_data, temp_settings_dir):
     Settings.from_file(p)
 
     # Non-empty config with paths
-    p.write_text(yaml.safe_dump(sample_settings_data))
+    p.write_text(sample_settings_yaml)
     s = Settings.from_file(p)
-    print(s.model_dump_json(indent=2))
 
     assert s.settings_path is not None
     s_root = s.settings_path.parent
@@ -63,3 +69,53 @@ def test_settings_path_handling(sample_settings_data, temp_settings_dir):
     assert not pr_a_s["module"].startswith("/"), (
         "The serialized path should be relative"
     )
+    assert pr_a.module.is_absolute(), "Serializing must not touch the model"
+
+
+def test_settings_json_cache(
+    sample_settings_data, sample_settings_yaml, temp_settings_dir
+):
+    p = temp_settings_dir / "settings.yaml"
+    p.write_text(sample_settings_yaml)
+    s = Settings.from_file(p)
+    s.save()
+    cache = Settings.cache_path_for(p)
+    assert cache.is_file()
+    assert Settings.from_file(p) == s
+
+    # A yaml file edited after the cache was written wins
+    no_projects = yaml.dump({**sample_settings_data, "projects": {}}, Dumper=YamlDumper)
+    p.write_text(no_projects)
+    assert "projectA" not in Settings.from_file(p).projects
+
+    # So does an older yaml restored with its mtime, like `cp -p` does
+    backup = temp_settings_dir / "backup.yaml"
+    backup.write_text(no_projects)
+    os.utime(backup, ns=(1, 1))
+    s.save()
+    shutil.copy2(backup, p)
+    assert "projectA" not in Settings.from_file(p).projects
+
+
+def test_hand_edited_settings_refresh_cache(
+    sample_settings_data, sample_settings_yaml, temp_settings_dir, monkeypatch
+):
+    p = temp_settings_dir / "settings.yaml"
+    p.write_text(sample_settings_yaml)
+    Settings.from_file(p).save()
+    p.write_text(yaml.dump({**sample_settings_data, "projects": {}}, Dumper=YamlDumper))
+    edited = Settings.from_file(p)
+
+    # The next load is served from the refreshed cache alone
+    _read_settings_data.cache_clear()
+    monkeypatch.setattr(settings_module, "_yaml_load", None)
+    assert Settings.from_file(p) == edited
+
+
+def test_dsn_follows_field_changes():
+    conn = SqliteConnection(db_path=Path("db.sqlite"))
+    assert conn.get_dsn == "sqlite:///db.sqlite"
+    conn._convert_paths(Path("/data"), mode="abs")
+    assert conn.get_dsn == "sqlite:////data/db.sqlite"
+    copy = conn.model_copy(update={"db_path": Path("other.sqlite")})
+    assert copy.get_dsn == "sqlite:///other.sqlite"
@@ -0,0 +1,14 @@
+"""Tests for utils module."""
+
+import pytest
+
+from shed import utils
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+def test_dump_json_fallback_matches_orjson(monkeypatch, indent):
+    pytest.importorskip("orjson")
+    data = {"title": "Zürich ✈", "items": [1, 2.5, None, True], "nested": {"a": []}}
+    expected = utils.dump_json(data, indent=indent)
+    monkeypatch.setattr(utils, "orjson", None)
+    assert utils.dump_json(data, indent=indent) == expected